@@ -1,7 +1,18 @@
 import os
 import json
+import logging
+import posixpath
+from langchain.document_loaders import Docx2txtLoader, PyPDFLoader
 from document_analyzer.gcp.gcs_client import GCSClient
 
+logger = logging.getLogger(__name__)
+
+# LangChain loader used for each supported file extension
+LOADERS = {
+    ".pdf": PyPDFLoader,
+    ".docx": Docx2txtLoader,
+}
+
 class DocumentAnalyzer:
     """
     Analyzes documents stored in a GCS bucket.
@@ -17,14 +28,22 @@ class DocumentAnalyzer:
         """
         return self.gcs_client.list_files(folder)
 
-    def download_document(self, gcs_path: str):
+    def download_document(self, gcs_path: str, dest_folder: str = None, generation: int = None):
         """
         Downloads a document from GCS to a local folder.
+        Args:
+            gcs_path (str): GCS path of the document.
+            dest_folder (str, optional): Local folder to download to. Defaults to local_folder;
+                pass a tempfile.TemporaryDirectory() path to have it cleaned up automatically.
+            generation (int, optional): Only download this generation of the document, failing
+                if it was overwritten since (e.g. the generation whose CRC32C was recorded).
+        Returns:
+            str: The local file path.
         """
-        os.makedirs(self.local_folder, exist_ok=True)
-        local_path = os.path.join(self.local_folder, os.path.basename(gcs_path))
-        blob = self.gcs_client.bucket.blob(gcs_path)
-        blob.download_to_filename(local_path)
+        dest_folder = dest_folder or self.local_folder
+        os.makedirs(dest_folder, exist_ok=True)
+        local_path = os.path.join(dest_folder, os.path.basename(gcs_path))
+        self.gcs_client.download_blob(gcs_path, local_path, if_generation_match=generation)
         return local_path
 
     def extract_text(self, file_path: str):
@@ -32,18 +51,19 @@ class DocumentAnalyzer:
         Extracts text from a document (PDF, DOCX, etc.) using LangChain loaders.
         """
         ext = os.path.splitext(file_path)[1].lower()
-        if ext == ".pdf":
-            from langchain.document_loaders import PyPDFLoader
-            loader = PyPDFLoader(file_path)
-            docs = loader.load()
-            return " ".join([doc.page_content for doc in docs])
-        elif ext == ".docx":
-            from langchain.document_loaders import Docx2txtLoader
-            loader = Docx2txtLoader(file_path)
-            docs = loader.load()
-            return " ".join([doc.page_content for doc in docs])
-        else:
+        loader_cls = LOADERS.get(ext)
+        if loader_cls is None:
             raise ValueError("Unsupported file type for text extraction.")
+        docs = loader_cls(file_path).load()
+        return " ".join([doc.page_content for doc in docs])
+
+    def iter_batches(self, text: str, batch_size: int = 1000):
+        """
+        Lazily yields batches of approximately batch_size characters, so callers that
+        consume them one at a time never hold all the slices in memory at once.
+        """
+        for i in range(0, len(text), batch_size):
+            yield text[i:i+batch_size]
 
     def batch_text(self, text: str, batch_size: int = 1000):
         """
@@ -53,9 +73,11 @@ class DocumentAnalyzer:
 
     def save_batches_to_json(self, batches, original_filename, output_folder="batches"):
         """
-        Saves the batches as a JSON file locally.
+        Saves the batches as a JSON file locally. The array is written one batch at a time,
+        so batches may be a lazy iterable such as iter_batches(text) and no full list of
+        slices (or a JSON string of the whole document) is ever held in memory.
         Args:
-            batches (list): List of text batches.
+            batches (iterable): Text batches, e.g. a list or iter_batches(text).
             original_filename (str): The original file name (to build the output name).
             output_folder (str): Local folder to save the JSON file.
         Returns:
@@ -65,9 +87,24 @@ class DocumentAnalyzer:
         base = os.path.splitext(os.path.basename(original_filename))[0]
         output_path = os.path.join(output_folder, f"{base}_batches.json")
         with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(batches, f, ensure_ascii=False, indent=2)
+            f.write("[")
+            for i, batch in enumerate(batches):
+                if i:
+                    f.write(", ")
+                f.write(json.dumps(batch, ensure_ascii=False))
+            f.write("]")
         return output_path
 
+    def load_batches_from_gcs(self, gcs_path: str):
+        """
+        Loads a batches JSON file from GCS without staging it on local disk.
+        Args:
+            gcs_path (str): GCS path of the batches JSON file.
+        Returns:
+            list: List of text batches.
+        """
+        return json.loads(self.gcs_client.download_bytes(gcs_path))
+
     def upload_batches_to_gcs(self, local_path, gcs_folder="batches"):
         """
         Uploads the local JSON file with batches to GCS.
@@ -80,41 +117,69 @@ class DocumentAnalyzer:
         filename = os.path.basename(local_path)
         destination_blob = os.path.join(gcs_folder, filename)
         self.gcs_client.upload_blob(local_path, destination_blob)
-        print(f"Batches uploaded to {destination_blob}")
+        logger.info("Batches uploaded to %s", destination_blob)
         return destination_blob
 
-    def save_and_upload_batches(self, batches, original_gcs_path, output_folder="batches"):
+    def get_batches_path(self, original_gcs_path):
         """
-        Saves batches to a local JSON file and uploads it to GCS, preserving the folder structure
-        but replacing 'raw' with 'batches' at the root.
+        Builds the GCS path of the batches JSON file for a document: same folders with 'raw'
+        replaced by 'batches' at the root, and the original filename replaced by the batch filename.
 
         Args:
-            batches (list): List of text batches.
             original_gcs_path (str): The original GCS path of the document.
-            output_folder (str): Local temporary folder to save the JSON file.
 
         Returns:
-            str: GCS path where the file was uploaded.
+            str: GCS path of the batches JSON file.
         """
-        # Build the new GCS path for the batches JSON file
-        parts = original_gcs_path.split('/')
+        # Split on "/" rather than parsing with PurePosixPath, which drops "./" and keeps a
+        # leading "/" as a root part, so existing batch blob names would change
+        *parts, filename = original_gcs_path.split("/")
         if parts and parts[0] == "raw":
             parts[0] = "batches"
-        
-        base, _ = os.path.splitext(os.path.basename(original_gcs_path))
-        batch_filename = f"{base}_batches.json"
-        
-        # Replace original filename with new batch filename
-        if len(parts) > 1:
-            gcs_batches_path = os.path.join(*parts[:-1], batch_filename).replace("\\", "/")
-        else:
-            gcs_batches_path = batch_filename
-
-        # Save locally
-        local_path = self.save_batches_to_json(batches, base, output_folder)
-
-        # Upload to the new path in GCS
-        self.gcs_client.upload_blob(local_path, gcs_batches_path)
-        print(f"Batches uploaded to {gcs_batches_path}")
-        os.remove(local_path) # Clean up local file
-        return gcs_batches_path 
\ No newline at end of file
+        stem = posixpath.splitext(filename)[0]
+        return posixpath.join(*parts, f"{stem}_batches.json")
+
+    def batches_up_to_date(self, original_gcs_path, source_blob=None):
+        """
+        Checks whether the batches file of a document was generated from its current version,
+        by comparing the source CRC32C recorded on the batches blob with the document's.
+
+        Args:
+            original_gcs_path (str): The original GCS path of the document.
+            source_blob (google.cloud.storage.Blob, optional): The document's blob, as returned by
+                GCSClient.get_blob; fetched if omitted.
+
+        Returns:
+            bool: True if the batches can be reused and extraction skipped.
+        """
+        batches_blob = self.gcs_client.get_blob(self.get_batches_path(original_gcs_path))
+        if batches_blob is None or not batches_blob.metadata:
+            return False
+        if source_blob is None:
+            source_blob = self.gcs_client.get_blob(original_gcs_path)
+        return source_blob is not None and batches_blob.metadata.get("source_crc32c") == source_blob.crc32c
+
+    def save_and_upload_batches(self, batches, original_gcs_path, output_folder="batches", source_crc32c: str = None):
+        """
+        Serializes batches to JSON and uploads them to GCS from memory, preserving the folder
+        structure but replacing 'raw' with 'batches' at the root.
+
+        Args:
+            batches (list): List of text batches.
+            original_gcs_path (str): The original GCS path of the document.
+            output_folder (str): Unused; kept for backwards compatibility.
+            source_crc32c (str, optional): CRC32C of the document version the batches were
+                extracted from. Stored on the batches blob so batches_up_to_date can detect
+                unchanged documents; without it the batches are regenerated on the next run.
+
+        Returns:
+            str: GCS path where the file was uploaded.
+        """
+        gcs_batches_path = self.get_batches_path(original_gcs_path)
+        metadata = {"source_crc32c": source_crc32c} if source_crc32c else None
+
+        # Upload to the new path in GCS straight from memory
+        data = json.dumps(batches, ensure_ascii=False)
+        self.gcs_client.upload_string(data, gcs_batches_path, metadata=metadata)
+        logger.info("Batches uploaded to %s", gcs_batches_path)
+        return gcs_batches_path
@@ -1,26 +1,74 @@
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
 from webdriver_manager.chrome import ChromeDriverManager
 from urllib.parse import urljoin, urlparse
+import atexit
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import logging
 import os
+import posixpath
+import re
+import shutil
+import tempfile
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from document_analyzer.gcp.gcs_client import GCSClient
 
+logger = logging.getLogger(__name__)
+
+# Matches a supported document extension (.pdf, .doc, .docx, .pptx, .xlsx) followed by the
+# end of the URL or by one of ?#&/;, so "report.pdf?dl=1", "a.pdf/view" and
+# "b.pdf;jsessionid=..." match but "report.pdf.html" and "x.doc-viewer" do not
+_DOC_EXT_RE = re.compile(r"\.(?:pdf|docx?|pptx|xlsx)(?=$|[?#&/;])", re.IGNORECASE)
+
+# Collects the link attribute of every element matching each (selector, attribute) pair
+# inside the browser, so the whole page is read in a single WebDriver round-trip. Only
+# strings (or null) are returned: on SVG <a> elements el.href is an SVGAnimatedString
+# object, so the raw attribute is used instead and resolved later by _absolute_url.
+_COLLECT_LINKS_SCRIPT = """
+return arguments[0].flatMap(([selector, attr]) =>
+    Array.from(document.querySelectorAll(selector),
+        el => typeof el[attr] === "string" ? el[attr] : el.getAttribute(attr)));
+"""
+
+
+def _absolute_url(base: str, link: str) -> str:
+    """
+    Resolves link against base, skipping the URL parser for links that are already absolute.
+    """
+    if link.startswith(("http://", "https://")):
+        return link
+    return urljoin(base, link)
+
+
 class DocumentDownloader:
     """
     Downloads all document files from a given URL and uploads them to a GCS bucket.
     Uses Selenium to handle dynamically rendered content, searching in <a>, <iframe>, and <embed> tags.
     """
 
-    def __init__(self, gcs_client: GCSClient):
+    def __init__(self, gcs_client: GCSClient, chrome_binary_location: str = None, timeout: float = 30):
         """
         Initializes the DocumentDownloader with a GCS client.
 
         Args:
             gcs_client (GCSClient): An instance of the GCSClient class.
+            chrome_binary_location (str, optional): Path to the Chrome binary to drive,
+                e.g. chrome-headless-shell, which starts faster than full Chrome.
+            timeout (float): Connect/read timeout in seconds for document downloads.
         """
         self.gcs_client = gcs_client
+        self.chrome_binary_location = chrome_binary_location
+        self.timeout = timeout
+        self._driver = None
+        # Shared session so downloads from the same host reuse keep-alive connections,
+        # retrying transient failures with exponential backoff
+        self._session = requests.Session()
+        retries = Retry(total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retries)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
 
     def get_document_links(self, url: str, a_class: str = None):
         """
@@ -34,41 +82,61 @@ class DocumentDownloader:
         Returns:
             list: A list of absolute URLs to document files.
         """
-        options = Options()
-        options.add_argument("--headless")
-        driver = webdriver.Chrome()
+        driver = self._get_driver()
         driver.get(url)
 
-        exts = [".pdf", ".docx", ".doc", ".pptx", ".xlsx"]
-        doc_links = set()
-
-        # <a> tags
-        if a_class:
-            links = driver.find_elements(By.CSS_SELECTOR, f"a.{a_class}")
-        else:
-            links = driver.find_elements(By.TAG_NAME, "a")
-        for link in links:
-            href = link.get_attribute("href")
-            if href and any(ext in href.lower() for ext in exts):
-                doc_links.add(urljoin(url, href))
-
-        # <iframe> tags
-        iframes = driver.find_elements(By.TAG_NAME, "iframe")
-        for iframe in iframes:
-            src = iframe.get_attribute("src")
-            if src and any(ext in src.lower() for ext in exts):
-                doc_links.add(urljoin(url, src))
-
-        # <embed> tags
-        embeds = driver.find_elements(By.TAG_NAME, "embed")
-        for embed in embeds:
-            src = embed.get_attribute("src")
-            if src and any(ext in src.lower() for ext in exts):
-                doc_links.add(urljoin(url, src))
-
-        driver.quit()
+        # (CSS selector, attribute holding the link) for <a>, <iframe> and <embed> tags
+        sources = [
+            [f"a.{a_class}" if a_class else "a", "href"],
+            ["iframe", "src"],
+            ["embed", "src"],
+        ]
+        links = driver.execute_script(_COLLECT_LINKS_SCRIPT, sources)
+        doc_links = {_absolute_url(url, link) for link in links if self._is_document_link(link)}
         return list(doc_links)
 
+    def _get_driver(self):
+        """
+        Returns the headless Chrome driver, starting it on first use.
+        The same browser is reused across calls and shut down at interpreter exit.
+
+        Returns:
+            webdriver.Chrome: The shared driver instance.
+        """
+        if self._driver is None:
+            options = Options()
+            options.add_argument("--headless=new")
+            options.add_argument("--disable-gpu")
+            options.add_argument("--no-sandbox")
+            options.add_argument("--disable-dev-shm-usage")
+            if self.chrome_binary_location:
+                options.binary_location = self.chrome_binary_location
+            self._driver = webdriver.Chrome(options=options)
+            atexit.register(self.close)
+        return self._driver
+
+    def close(self):
+        """
+        Shuts down the browser driver if it was started.
+        """
+        if self._driver is not None:
+            self._driver.quit()
+            self._driver = None
+
+    @staticmethod
+    def _is_document_link(link: str) -> bool:
+        """
+        Checks whether a link points to one of the supported document types.
+
+        Args:
+            link (str): The href/src value of an element (may be None or, for unusual
+                elements, a non-string value returned by WebDriver).
+
+        Returns:
+            bool: True if the link contains a document extension.
+        """
+        return isinstance(link, str) and _DOC_EXT_RE.search(link) is not None
+
     def download_file(self, file_url: str, dest_folder: str = "downloads"):
         """
         Downloads a file from a URL to a local folder.
@@ -82,30 +150,84 @@ class DocumentDownloader:
         """
         os.makedirs(dest_folder, exist_ok=True)
         local_filename = os.path.join(dest_folder, os.path.basename(urlparse(file_url).path))
-        with requests.get(file_url, stream=True) as r:
+        with self._session.get(file_url, stream=True, timeout=self.timeout) as r:
             r.raise_for_status()
+            # Let urllib3 undo any Content-Encoding and copy in 1 MiB blocks from C
+            r.raw.decode_content = True
             with open(local_filename, "wb") as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    f.write(chunk)
+                shutil.copyfileobj(r.raw, f, length=1024 * 1024)
         return local_filename
 
-    def process_url(self, url: str, gcs_folder: str = "", a_class: str = None):
+    def _process_document(self, doc_url: str, gcs_folder: str = "", known_metadata: dict = None):
+        """
+        Streams a single document from its URL straight into GCS, without a local copy.
+        If the blob was uploaded before, a conditional GET is sent with the stored ETag /
+        Last-Modified and the document is skipped when the server answers 304 Not Modified.
+        When the body cannot be streamed (the server compressed it anyway, or the streaming
+        upload failed and the body cannot be rewound), it is re-downloaded to a temporary file
+        and uploaded from there.
+
+        Args:
+            doc_url (str): The URL of the document.
+            gcs_folder (str): The folder in the GCS bucket to upload the file to.
+            known_metadata (dict, optional): Metadata of the blobs already in gcs_folder, as
+                returned by GCSClient.get_blobs_metadata.
+
+        Returns:
+            str: The destination blob name.
+        """
+        filename = os.path.basename(urlparse(doc_url).path)
+        destination_blob = posixpath.join(gcs_folder, filename).replace("\\", "/")
+
+        stored = (known_metadata or {}).get(destination_blob, {})
+        # Ask for the body as-is: the resumable upload takes its byte ranges from the raw
+        # stream position, which only matches the bytes read when nothing is decoded
+        headers = {"Accept-Encoding": "identity"}
+        if stored.get("etag"):
+            headers["If-None-Match"] = stored["etag"]
+        if stored.get("last_modified"):
+            headers["If-Modified-Since"] = stored["last_modified"]
+
+        logger.debug("Streaming %s to GCS as %s ...", doc_url, destination_blob)
+        with self._session.get(doc_url, stream=True, headers=headers, timeout=self.timeout) as r:
+            if r.status_code == 304:
+                logger.debug("%s is unchanged, skipping.", doc_url)
+                return destination_blob
+            r.raise_for_status()
+            content_type = r.headers.get("content-type")
+            metadata = {"etag": r.headers.get("ETag"), "last_modified": r.headers.get("Last-Modified")}
+            metadata = {key: value for key, value in metadata.items() if value}
+            if r.headers.get("Content-Encoding", "identity").lower() == "identity":
+                try:
+                    self.gcs_client.upload_fileobj(r.raw, destination_blob, content_type=content_type, metadata=metadata)
+                    return destination_blob
+                except Exception as e:
+                    logger.warning("Streaming upload of %s failed (%s); retrying through a temporary file.", doc_url, e)
+
+        # Stage the document on disk, where the upload can seek and retry chunks
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            local_path = self.download_file(doc_url, dest_folder=tmp_dir)
+            self.gcs_client.upload_blob(local_path, destination_blob, content_type=content_type, metadata=metadata)
+        return destination_blob
+
+    def process_url(self, url: str, gcs_folder: str = "", a_class: str = None, max_workers: int = 8, skip_unchanged: bool = True):
         """
         Downloads all documents from the given URL and uploads them to GCS.
+        Documents are downloaded and uploaded concurrently.
 
         Args:
             url (str): The URL to process.
             gcs_folder (str): The folder in the GCS bucket to upload files to.
             a_class (str, optional): If provided, only <a> tags with this class will be considered.
+            max_workers (int): Maximum number of documents processed at the same time.
+            skip_unchanged (bool): If True, documents already in gcs_folder are only re-downloaded
+                when the server reports they changed since the previous upload.
         """
         doc_links = self.get_document_links(url, a_class=a_class)
-        print(f"Found {len(doc_links)} document(s) at {url}")
-        for doc_url in doc_links:
-            print(f"Downloading {doc_url} ...")
-            local_path = self.download_file(doc_url)
-            destination_blob = os.path.join(gcs_folder, os.path.basename(local_path)) if gcs_folder else os.path.basename(local_path)
-            destination_blob=  destination_blob.replace("\\","/")
-            print(f"Uploading {local_path} to GCS as {destination_blob} ...")
-            self.gcs_client.upload_blob(local_path, destination_blob)
-            os.remove(local_path)
-        print("All documents processed and uploaded.") 
\ No newline at end of file
+        logger.info("Found %d document(s) at %s", len(doc_links), url)
+        known_metadata = self.gcs_client.get_blobs_metadata(gcs_folder) if skip_unchanged else {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(self._process_document, doc_url, gcs_folder, known_metadata) for doc_url in doc_links]
+            for future in as_completed(futures):
+                future.result()
+        logger.info("All documents processed and uploaded.")
\ No newline at end of file
@@ -1,4 +1,12 @@
+import argparse
+import fnmatch
+import logging
+import multiprocessing
 import os
+import re
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from document_analyzer.gcp.gcs_client import GCSClient
 from document_analyzer.ai.document_analyzer import DocumentAnalyzer
 
@@ -9,44 +17,122 @@ def process_file(analyzer, gcs_file_path):
     """Downloads, analyzes, and uploads batches for a single file."""
     print(f"\n--- Processing: {gcs_file_path} ---")
     try:
-        local_path = analyzer.download_document(gcs_file_path)
-        text = analyzer.extract_text(local_path)
+        source_blob = analyzer.gcs_client.get_blob(gcs_file_path)
+        if source_blob is None:
+            print(f"{gcs_file_path} no longer exists, skipping.")
+            return
+        if analyzer.batches_up_to_date(gcs_file_path, source_blob):
+            print(f"Batches for {gcs_file_path} are up to date (cached), skipping.")
+            return
+        # The temporary directory (and the downloaded file) is removed on exit. Pinning the
+        # generation makes the download fail if the document is overwritten meanwhile, so the
+        # batches are always tagged with the CRC32C of the content they were extracted from.
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            local_path = analyzer.download_document(gcs_file_path, dest_folder=tmp_dir, generation=source_blob.generation)
+            text = analyzer.extract_text(local_path)
         batches = analyzer.batch_text(text, batch_size=1000)
-        
-        gcs_batches_path = analyzer.save_and_upload_batches(batches, gcs_file_path)
+
+        gcs_batches_path = analyzer.save_and_upload_batches(batches, gcs_file_path, source_crc32c=source_blob.crc32c)
         print(f"Batches for {os.path.basename(local_path)} uploaded to: {gcs_batches_path}")
     except Exception as e:
         print(f"Failed to process {gcs_file_path}. Error: {e}")
 
+def _init_worker(log_level):
+    """Configures logging in a worker process; spawned workers don't inherit the parent's handlers."""
+    logging.basicConfig(level=log_level)
+
+def _worker(gcs_file_path):
+    """Processes a file in a worker process, with an analyzer local to that process."""
+    process_file(DocumentAnalyzer(GCSClient()), gcs_file_path)
+
+def process_all(files):
+    """Processes the given files in parallel worker processes."""
+    # PDF parsing is CPU-bound, so spread the files across processes. Workers are spawned,
+    # not forked: a forked child would inherit the parent's cached storage client and share
+    # its pooled TLS connections with the parent and its siblings. Being spawned, they also
+    # start without the parent's logging setup, so it is repeated in each of them.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(logging.getLogger().level,),
+    ) as executor:
+        list(executor.map(_worker, files))
+    print("\nAll files processed.")
+
+def listing_prefix(pattern):
+    """
+    Returns the GCS prefix to list for a glob pattern: its literal part before the first
+    wildcard, so every blob the pattern can match is listed and nothing else.
+    """
+    return re.split(r"[*?[]", pattern, maxsplit=1)[0]
+
+def parse_args():
+    """Parses the command-line arguments selecting which documents to process."""
+    parser = argparse.ArgumentParser(description="Extracts text batches from documents in a GCS folder.")
+    parser.add_argument("--folder", default=GCS_FOLDER, help="GCS folder to analyze.")
+    selection = parser.add_mutually_exclusive_group()
+    selection.add_argument("--index", type=int, help="Process the file at this position of the listing.")
+    selection.add_argument("--all", action="store_true", help="Process every file in the folder.")
+    selection.add_argument(
+        "--glob",
+        help="Process every file in the bucket whose full GCS path matches this fnmatch pattern, "
+        "e.g. 'raw/financial_documents/gft/*2024*.pdf' (--folder is ignored). '*' also matches '/', "
+        "so 'gft/*.pdf' includes PDFs in subfolders of gft.",
+    )
+    return parser.parse_args()
+
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args()
     gcs = GCSClient()
     analyzer = DocumentAnalyzer(gcs)
 
+    if args.glob:
+        # Filter on the client before any download starts, listing only the literal prefix
+        files = fnmatch.filter(gcs.list_files(listing_prefix(args.glob)), args.glob)
+        print(f"{len(files)} file(s) match {args.glob}")
+        if files:
+            process_all(files)
+        sys.exit(0)
+
     # List documents in the folder
-    files = analyzer.list_documents(GCS_FOLDER)
-    print("Files in GCS folder:")
-    for idx, f in enumerate(files):
-        print(f"[{idx}] {f}")
-    print("[all] To process all documents")
+    files = analyzer.list_documents(args.folder)
 
-    # Select a file or process all
     if not files:
         print("No files found in the folder.")
-        exit(0)
-    
-    selection = input("Select a file by index or type 'all': ")
-
-    if selection.lower() == 'all':
-        for f in files:
-            process_file(analyzer, f)
-        print("\nAll files processed.")
+        sys.exit(0)
+
+    if args.all:
+        process_all(files)
+    elif args.index is not None:
+        if 0 <= args.index < len(files):
+            process_file(analyzer, files[args.index])
+        else:
+            print("Invalid index.")
+            sys.exit(1)
+    elif sys.stdin.isatty():
+        print("Files in GCS folder:")
+        for idx, f in enumerate(files):
+            print(f"[{idx}] {f}")
+        print("[all] To process all documents")
+
+        # Select a file or process all
+        selection = input("Select a file by index or type 'all': ")
+
+        if selection.lower() == 'all':
+            process_all(files)
+        else:
+            try:
+                selected_idx = int(selection)
+                if 0 <= selected_idx < len(files):
+                    selected_file = files[selected_idx]
+                    process_file(analyzer, selected_file)
+                else:
+                    print("Invalid index.")
+            except ValueError:
+                print("Invalid input. Please enter a number or 'all'.")
     else:
-        try:
-            selected_idx = int(selection)
-            if 0 <= selected_idx < len(files):
-                selected_file = files[selected_idx]
-                process_file(analyzer, selected_file)
-            else:
-                print("Invalid index.")
-        except ValueError:
-            print("Invalid input. Please enter a number or 'all'.") 
\ No newline at end of file
+        print("No selection given; pass --index, --all or --glob when not running interactively.")
+        sys.exit(1)
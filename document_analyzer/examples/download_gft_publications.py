@@ -1,4 +1,5 @@
 
+import logging
 import sys
 from urllib.parse import urlparse
 from document_analyzer.gcp.gcs_client import GCSClient
@@ -8,13 +9,11 @@ def build_gcs_folder(url: str) -> str:
     """
     Constructs the GCS folder path using the URL, following the convention:
     raw/application/domain, where domain is extracted from the URL.
-    Removes 'https', 'http', 'www.' and '.com' as specified.
+    Removes 'https', 'http', a leading 'www.' and a trailing '.com' as specified.
     """
-    parsed = urlparse(url)
-    # Remove 'www.' and '.com' from netloc
-    domain = parsed.netloc.replace('www.', '').replace('.com', '')
+    netloc = urlparse(url).netloc
+    domain = netloc.removeprefix('www.').removesuffix('.com')
     application = 'financial_documents'
-    print(f"    domain  = {    domain }")
     return f"raw/{application}/{domain}"
 
 def main():
@@ -36,4 +35,5 @@ def main():
     downloader.process_url(url, gcs_folder=gcs_folder)
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     main() 
\ No newline at end of file
@@ -1,5 +1,5 @@
 from google.cloud import bigquery
-from .config import Config
+from .config import get_config
 
 class BigQueryClient:
     """
@@ -9,8 +9,9 @@ class BigQueryClient:
         """
         Initializes the BigQuery client.
         """
-        self.client = bigquery.Client(project=Config.GCP_PROJECT_ID)
-        self.dataset = Config.BQ_DATASET
+        config = get_config()
+        self.client = bigquery.Client(project=config.GCP_PROJECT_ID)
+        self.dataset = config.BQ_DATASET
 
     def query(self, sql: str):
         """
@@ -1,17 +1,51 @@
 import os
+import warnings
+from dataclasses import dataclass
+from functools import cache
 from dotenv import load_dotenv
-load_dotenv()
-class Config:
+
+_ENV_VARS = ("GCP_PROJECT_ID", "GCS_BUCKET", "BQ_DATASET", "GOOGLE_APPLICATION_CREDENTIALS")
+
+
+class _ConfigMeta(type):
+    """
+    Keeps the class-level access of the old Config (e.g. Config.GCP_PROJECT_ID) working,
+    with a DeprecationWarning, by forwarding it to get_config().
+    """
+    def __getattribute__(cls, name):
+        if name in _ENV_VARS and "__dataclass_fields__" in type.__getattribute__(cls, "__dict__"):
+            warnings.warn(
+                f"Config.{name} is deprecated; use get_config().{name} instead.",
+                DeprecationWarning,
+                stacklevel=2,
+            )
+            return getattr(get_config(), name)
+        return super().__getattribute__(name)
+
+
+@dataclass(frozen=True, slots=True)
+class Config(metaclass=_ConfigMeta):
+    """
+    Environment variables required for Google Cloud services.
+    """
+    GCP_PROJECT_ID: str
+    GCS_BUCKET: str
+    BQ_DATASET: str
+    GOOGLE_APPLICATION_CREDENTIALS: str
+
+
+@cache
+def get_config() -> Config:
     """
-    Loads and provides access to environment variables required for Google Cloud services.
+    Loads the Google Cloud configuration from the environment (and a .env file, if present).
+    The result is cached, so the environment is only read once per process.
     Raises an error if any required variable is missing.
+
+    Returns:
+        Config: The loaded configuration.
     """
     load_dotenv()
-    GCP_PROJECT_ID = os.getenv("GCP_PROJECT_ID")
-    GCS_BUCKET = os.getenv("GCS_BUCKET")
-    BQ_DATASET = os.getenv("BQ_DATASET")
-    GOOGLE_APPLICATION_CREDENTIALS = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
-
-    required_vars = [GCP_PROJECT_ID, GCS_BUCKET, BQ_DATASET, GOOGLE_APPLICATION_CREDENTIALS]
-    if not all(required_vars):
-        raise ValueError("Missing required environment variables for Google Cloud configuration.") 
\ No newline at end of file
+    values = {name: os.getenv(name) for name in _ENV_VARS}
+    if not all(values.values()):
+        raise ValueError("Missing required environment variables for Google Cloud configuration.")
+    return Config(**values)
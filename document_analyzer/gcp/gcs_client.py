@@ -1,36 +1,187 @@
+import logging
+from functools import lru_cache
+import google.auth
+import google_crc32c
+from google.auth.transport.requests import AuthorizedSession
 from google.cloud import storage
-from .config import Config
+from requests.adapters import HTTPAdapter
+from .config import get_config
+
+logger = logging.getLogger(__name__)
+
+# Connections kept per host by the shared HTTP session. requests defaults to 10; thread
+# pools sharing a GCSClient beyond that (e.g. DocumentDownloader.process_url with more than
+# 10 workers) would open and discard connections. More sockets are traded for lower tail latency.
+_HTTP_POOL_SIZE = 32
+
+
+@lru_cache(maxsize=None)
+def _get_storage_client(project: str) -> storage.Client:
+    """
+    Returns a process-wide storage client for the given project, so every GCSClient
+    shares the same authorized HTTP session and its keep-alive connections.
+    """
+    if google_crc32c.implementation != "c":
+        logger.warning(
+            "google-crc32c is using its pure-Python fallback; upload checksums will be slow. "
+            "Reinstall google-crc32c with its C extension for hardware-accelerated CRC32C."
+        )
+    credentials, _ = google.auth.default(scopes=storage.Client.SCOPE)
+    session = AuthorizedSession(credentials)
+    adapter = HTTPAdapter(pool_connections=_HTTP_POOL_SIZE, pool_maxsize=_HTTP_POOL_SIZE)
+    session.mount("https://", adapter)
+    return storage.Client(project=project, credentials=credentials, _http=session)
+
 
 class GCSClient:
     """
     Google Cloud Storage client for file operations in a specific bucket.
     """
-    def __init__(self):
+    def __init__(self, chunk_size: int = None):
         """
         Initializes the GCS client and sets the target bucket.
+
+        Args:
+            chunk_size (int, optional): Transfer chunk size in bytes (a multiple of 256 KiB)
+                used for uploads and downloads. Small values such as 262144 keep per-transfer
+                buffers small when moving many small files; None uses the library default.
         """
-        self.client = storage.Client(project=Config.GCP_PROJECT_ID)
-        self.bucket = self.client.bucket(Config.GCS_BUCKET)
+        config = get_config()
+        self.client = _get_storage_client(config.GCP_PROJECT_ID)
+        self.bucket = self.client.bucket(config.GCS_BUCKET)
+        self.chunk_size = chunk_size
 
-    def upload_blob(self, source_file_name: str, destination_blob_name: str) -> None:
+    def _blob(self, blob_name: str):
+        """
+        Returns a blob handle in the configured bucket using the client's chunk size.
+        """
+        return self.bucket.blob(blob_name, chunk_size=self.chunk_size)
+
+    def upload_blob(self, source_file_name: str, destination_blob_name: str, content_type: str = None, metadata: dict = None) -> None:
         """
         Uploads a file to the configured GCS bucket.
 
         Args:
             source_file_name (str): Path to the local file to upload.
             destination_blob_name (str): Destination path in the bucket.
+            content_type (str, optional): MIME type stored on the blob; guessed from the name if omitted.
+            metadata (dict, optional): Custom metadata stored on the blob.
+        """
+        blob = self._blob(destination_blob_name)
+        blob.metadata = metadata
+        blob.upload_from_filename(source_file_name, content_type=content_type, checksum="crc32c")
+        logger.debug("File %s uploaded to %s.", source_file_name, destination_blob_name)
+
+    def upload_fileobj(self, file_obj, destination_blob_name: str, content_type: str = None, metadata: dict = None) -> None:
+        """
+        Streams a readable file-like object (e.g. an HTTP response body) to the configured
+        GCS bucket, without staging it on local disk.
+
+        The upload is sent in resumable chunks whose byte ranges come from file_obj.tell(),
+        so tell() must count the bytes that read() returns (for an HTTP body: not
+        Content-Encoding compressed). A non-seekable stream cannot replay a failed chunk,
+        so the upload is not retried; callers should fall back to upload_blob on failure.
+
+        Args:
+            file_obj: Readable binary stream, consumed from its current position.
+            destination_blob_name (str): Destination path in the bucket.
+            content_type (str, optional): MIME type stored on the blob.
+            metadata (dict, optional): Custom metadata stored on the blob.
+        """
+        blob = self._blob(destination_blob_name)
+        blob.metadata = metadata
+        blob.upload_from_file(file_obj, rewind=False, content_type=content_type, checksum="crc32c", retry=None)
+        logger.debug("Stream uploaded to %s.", destination_blob_name)
+
+    def upload_string(self, data, destination_blob_name: str, content_type: str = "application/json", metadata: dict = None) -> None:
+        """
+        Uploads in-memory data to the configured GCS bucket without a local file.
+        The payload is verified server-side with a CRC32C checksum.
+
+        Args:
+            data (str | bytes): Contents to upload.
+            destination_blob_name (str): Destination path in the bucket.
+            content_type (str): MIME type stored on the blob.
+            metadata (dict, optional): Custom metadata stored on the blob.
+        """
+        blob = self._blob(destination_blob_name)
+        blob.metadata = metadata
+        blob.upload_from_string(data, content_type=content_type, checksum="crc32c")
+        logger.debug("Data uploaded to %s.", destination_blob_name)
+
+    def get_blob(self, blob_name: str):
+        """
+        Fetches a blob's properties (checksums, custom metadata, ...) without its contents.
+
+        Args:
+            blob_name (str): Path of the blob in the bucket.
+        Returns:
+            google.cloud.storage.Blob: The blob, or None if it does not exist.
+        """
+        return self.bucket.get_blob(blob_name)
+
+    def download_blob(self, blob_name: str, destination_file_name: str, if_generation_match: int = None) -> None:
+        """
+        Downloads a blob from the configured GCS bucket to a local file.
+
+        Args:
+            blob_name (str): Path of the blob in the bucket.
+            destination_file_name (str): Local path to write the file to.
+            if_generation_match (int, optional): Only download this generation of the blob;
+                fails with PreconditionFailed if the blob was overwritten since.
+        """
+        blob = self._blob(blob_name)
+        blob.download_to_filename(destination_file_name, if_generation_match=if_generation_match)
+        logger.debug("Blob %s downloaded to %s.", blob_name, destination_file_name)
+
+    def download_bytes(self, blob_name: str) -> bytes:
+        """
+        Downloads a blob from the configured GCS bucket straight into memory.
+
+        Args:
+            blob_name (str): Path of the blob in the bucket.
+        Returns:
+            bytes: The blob contents.
+        """
+        blob = self._blob(blob_name)
+        return blob.download_as_bytes()
+
+    def iter_files(self, folder: str = "", page_size: int = 1000, max_results: int = None):
+        """
+        Lazily yields the files in the given folder of the GCS bucket, fetching the
+        listing page by page so callers can start working before it completes.
+        Args:
+            folder (str): The folder path in the bucket.
+            page_size (int): Number of blobs requested per listing page.
+            max_results (int, optional): Stop paging once this many blobs have been listed.
+        Yields:
+            str: File names.
+        """
+        blobs = self.bucket.list_blobs(prefix=folder, page_size=page_size, max_results=max_results)
+        for blob in blobs:
+            if not blob.name.endswith("/"):
+                yield blob.name
+
+    def get_blobs_metadata(self, folder: str = ""):
+        """
+        Returns the custom metadata of the files directly inside the given folder of the
+        GCS bucket, from a single listing (subfolders are not descended into).
+        Args:
+            folder (str): The folder path in the bucket.
+        Returns:
+            dict: Mapping of file name (str) to its custom metadata (dict).
         """
-        blob = self.bucket.blob(destination_blob_name)
-        blob.upload_from_filename(source_file_name)
-        print(f"File {source_file_name} uploaded to {destination_blob_name}.")
+        prefix = f"{folder.rstrip('/')}/" if folder else ""
+        blobs = self.bucket.list_blobs(prefix=prefix, delimiter="/")
+        return {blob.name: blob.metadata or {} for blob in blobs if not blob.name.endswith("/")}
 
-    def list_files(self, folder: str = ""):
+    def list_files(self, folder: str = "", max_results: int = None):
         """
         Lists all files in the given folder of the GCS bucket.
         Args:
             folder (str): The folder path in the bucket.
+            max_results (int, optional): Maximum number of blobs to list.
         Returns:
             list: List of file names (str).
         """
-        blobs = self.bucket.list_blobs(prefix=folder)
-        return [blob.name for blob in blobs if not blob.name.endswith("/")] 
\ No newline at end of file
+        return list(self.iter_files(folder, max_results=max_results))